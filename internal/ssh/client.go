@@ -14,14 +14,22 @@ import (
 	"golang.org/x/crypto/ssh"
 )
 
+// keepaliveInterval is how often an idle connection is pinged. Each
+// client already multiplexes every session over one TCP connection —
+// the keepalive keeps NAT and firewall idle timeouts from silently
+// killing it, which would force a full reconnect handshake on the
+// next command.
+const keepaliveInterval = 30 * time.Second
+
 // Client represents a single SSH connection with state tracking.
 type Client struct {
-	alias string
-	conn  *ssh.Client
-	sftp  *sftp.Client
-	cwd   string
-	mu    sync.Mutex
-	creds Credentials
+	alias         string
+	conn          *ssh.Client
+	sftp          *sftp.Client
+	cwd           string
+	mu            sync.Mutex
+	creds         Credentials
+	stopKeepalive chan struct{}
 }
 
 // Credentials holds SSH connection parameters.
@@ -58,6 +66,10 @@ func (c *Client) connect(jumpClient *Client) error {
 		c.conn.Close()
 		c.conn = nil
 	}
+	if c.stopKeepalive != nil {
+		close(c.stopKeepalive)
+		c.stopKeepalive = nil
+	}
 
 	config := &ssh.ClientConfig{
 		User:            c.creds.Username,
@@ -108,6 +120,8 @@ func (c *Client) connect(jumpClient *Client) error {
 	}
 
 	c.conn = conn
+	c.stopKeepalive = make(chan struct{})
+	go keepalive(conn, c.stopKeepalive)
 
 	output, err := c.runRaw("pwd")
 	if err != nil {
@@ -121,6 +135,21 @@ func (c *Client) connect(jumpClient *Client) error {
 	return nil
 }
 
+// keepalive pings conn until stop is closed. Errors are ignored: a dead
+// connection is detected and reconnected by the next command.
+func keepalive(conn *ssh.Client, stop chan struct{}) {
+	ticker := time.NewTicker(keepaliveInterval)
+	defer ticker.Stop()
+	for {
+		select {
+		case <-stop:
+			return
+		case <-ticker.C:
+			conn.SendRequest("keepalive@openssh.com", true, nil)
+		}
+	}
+}
+
 // runRaw executes a command without CWD handling.
 func (c *Client) runRaw(cmd string) (string, error) {
 	session, err := c.conn.NewSession()
@@ -208,6 +237,55 @@ func (c *Client) Run(ctx context.Context, cmd string) (*RunResult, error) {
 	}, nil
 }
 
+// RunStream executes a command and streams its stdout as it is produced,
+// without buffering the full result or tracking CWD. The caller must
+// close the reader to release the session; closing before EOF kills the
+// remote command.
+func (c *Client) RunStream(ctx context.Context, cmd string) (io.ReadCloser, error) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	if c.conn == nil {
+		return nil, errors.New("not connected")
+	}
+
+	session, err := c.conn.NewSession()
+	if err != nil {
+		return nil, fmt.Errorf("failed to create session: %w", err)
+	}
+
+	stdout, err := session.StdoutPipe()
+	if err != nil {
+		session.Close()
+		return nil, fmt.Errorf("failed to open stdout pipe: %w", err)
+	}
+
+	if err := session.Start(cmd); err != nil {
+		session.Close()
+		return nil, fmt.Errorf("failed to start command: %w", err)
+	}
+
+	return &streamReader{session: session, stdout: stdout}, nil
+}
+
+// streamReader adapts a running session's stdout to io.ReadCloser.
+type streamReader struct {
+	session *ssh.Session
+	stdout  io.Reader
+}
+
+func (s *streamReader) Read(p []byte) (int, error) {
+	return s.stdout.Read(p)
+}
+
+func (s *streamReader) Close() error {
+	s.session.Signal(ssh.SIGKILL)
+	if err := s.session.Close(); err != nil && err != io.EOF {
+		return err
+	}
+	return nil
+}
+
 // RunResult contains command execution result.
 type RunResult struct {
 	Stdout   string
@@ -248,6 +326,11 @@ func (c *Client) Close() error {
 		c.sftp = nil
 	}
 
+	if c.stopKeepalive != nil {
+		close(c.stopKeepalive)
+		c.stopKeepalive = nil
+	}
+
 	if c.conn != nil {
 		err := c.conn.Close()
 		c.conn = nil
@@ -346,6 +346,27 @@ func (m *Manager) Execute(ctx context.Context, cmd, target string) (string, erro
 	return outputStr, nil
 }
 
+// ExecuteStream runs a command and returns a reader over its stdout as it
+// is produced, for callers that scan output line by line instead of
+// buffering the whole result. Unlike Execute it does no CWD tracking,
+// output formatting or reconnect handling.
+func (m *Manager) ExecuteStream(ctx context.Context, cmd, target string) (io.ReadCloser, error) {
+	alias, err := m.resolveTarget(target)
+	if err != nil {
+		return nil, err
+	}
+
+	m.mu.RLock()
+	client := m.connections[alias]
+	m.mu.RUnlock()
+
+	if client == nil {
+		return nil, fmt.Errorf("connection '%s' not found", alias)
+	}
+
+	return client.RunStream(ctx, cmd)
+}
+
 // resolvePath resolves a path to an absolute path using the connection's CWD.
 // No path restrictions — the connected user's OS permissions are the only boundary.
 func (m *Manager) resolvePath(path, alias string) string {
@@ -431,6 +452,69 @@ func (m *Manager) ReadFile(ctx context.Context, path, target string) (string, er
 	return string(content), nil
 }
 
+// OpenFile opens a remote file for streaming reads.
+// Unlike ReadFile, the content is not buffered in memory, so large files
+// can be consumed with constant RSS. The caller must close the reader.
+func (m *Manager) OpenFile(ctx context.Context, path, target string) (io.ReadCloser, error) {
+	alias, err := m.resolveTarget(target)
+	if err != nil {
+		return nil, err
+	}
+
+	resolved := m.resolvePath(path, alias)
+
+	m.mu.RLock()
+	client := m.connections[alias]
+	m.mu.RUnlock()
+
+	if client == nil {
+		return nil, fmt.Errorf("connection '%s' is no longer active", alias)
+	}
+
+	sftpClient, err := client.SFTP()
+	if err != nil {
+		return nil, err
+	}
+
+	file, err := sftpClient.Open(resolved)
+	if err != nil {
+		return nil, fmt.Errorf("failed to open file: %w", err)
+	}
+
+	return file, nil
+}
+
+// CreateFile opens a remote file for streaming writes.
+// The caller must close the writer to flush and release the handle.
+func (m *Manager) CreateFile(ctx context.Context, path, target string) (io.WriteCloser, error) {
+	alias, err := m.resolveTarget(target)
+	if err != nil {
+		return nil, err
+	}
+
+	resolved := m.resolvePath(path, alias)
+
+	m.mu.RLock()
+	client := m.connections[alias]
+	m.mu.RUnlock()
+
+	if client == nil {
+		return nil, fmt.Errorf("connection '%s' is no longer active", alias)
+	}
+
+	sftpClient, err := client.SFTP()
+	if err != nil {
+		return nil, err
+	}
+
+	file, err := sftpClient.Create(resolved)
+	if err != nil {
+		return nil, fmt.Errorf("failed to create file: %w", err)
+	}
+
+	return file, nil
+}
+
 // WriteFile writes content to a file.
 func (m *Manager) WriteFile(ctx context.Context, path, content, target string) error {
 	alias, err := m.resolveTarget(target)
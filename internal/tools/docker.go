@@ -193,15 +193,15 @@ func createDockerIPHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 		container, _ := req.RequireString("container")
 		target := req.GetString("target", "primary")
 
-		if err := checkDockerAvailable(ctx, mgr, target); err != nil {
-			return mcp.NewToolResultError(err.Error()), nil
-		}
-
-		cmd := fmt.Sprintf("docker inspect --format '{{range $net, $conf := .NetworkSettings.Networks}}{{$net}}:{{$conf.IPAddress}}|{{end}}' %s 2>/dev/null", shellQuote(container))
+		// The docker gate rides along with the inspect in one exec
+		cmd := fmt.Sprintf("command -v docker >/dev/null 2>&1 || { echo 'no-docker'; exit 0; }; docker inspect --format '{{range $net, $conf := .NetworkSettings.Networks}}{{$net}}:{{$conf.IPAddress}}|{{end}}' %s 2>/dev/null", shellQuote(container))
 		output, err := mgr.Execute(ctx, cmd, target)
 		if err != nil {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
+		if containsString(output, "no-docker") {
+			return mcp.NewToolResultError("docker command not found on target"), nil
+		}
 
 		return mcp.NewToolResultText(fmt.Sprintf("Container: %s\nNetworks: %s", container, output)), nil
 	}
@@ -217,15 +217,15 @@ func createDockerFindByIPHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 		ip, _ := req.RequireString("ip")
 		target := req.GetString("target", "primary")
 
-		if err := checkDockerAvailable(ctx, mgr, target); err != nil {
-			return mcp.NewToolResultError(err.Error()), nil
-		}
-
-		cmd := fmt.Sprintf(`docker ps -q | xargs -I {} docker inspect --format '{{.Name}}|{{range $net, $conf := .NetworkSettings.Networks}}{{$net}}:{{$conf.IPAddress}},{{end}}' {} 2>/dev/null | grep %s`, shellQuote(ip))
+		// The docker gate rides along with the lookup in one exec
+		cmd := fmt.Sprintf(`command -v docker >/dev/null 2>&1 || { echo 'no-docker'; exit 0; }; docker ps -q | xargs -I {} docker inspect --format '{{.Name}}|{{range $net, $conf := .NetworkSettings.Networks}}{{$net}}:{{$conf.IPAddress}},{{end}}' {} 2>/dev/null | grep %s`, shellQuote(ip))
 		output, err := mgr.Execute(ctx, cmd, target)
 		if err != nil {
 			return mcp.NewToolResultText(fmt.Sprintf("No container found with IP: %s", ip)), nil
 		}
+		if containsString(output, "no-docker") {
+			return mcp.NewToolResultError("docker command not found on target"), nil
+		}
 
 		return mcp.NewToolResultText(output), nil
 	}
@@ -315,12 +315,32 @@ func createDockerCpToHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 }
 
 func checkDockerAvailable(ctx context.Context, mgr *ssh.Manager, target string) error {
-	output, err := mgr.Execute(ctx, "command -v docker >/dev/null 2>&1 && echo 'ok' || echo 'missing'", target)
+	available, err := toolAvailable(ctx, mgr, target, "docker")
 	if err != nil {
 		return err
 	}
-	if !containsString(output, "ok") {
+	if !available {
 		return fmt.Errorf("docker command not found on target")
 	}
 	return nil
 }
+
+// checkContainerTool verifies in a single exec that docker exists on the
+// host and that tool is available inside the container, instead of
+// spending one SSH round-trip on each probe.
+func checkContainerTool(ctx context.Context, mgr *ssh.Manager, container, tool, target string) error {
+	cmd := fmt.Sprintf("command -v docker >/dev/null 2>&1 || { echo 'no-docker'; exit 0; }; docker exec %s command -v %s >/dev/null 2>&1 && echo 'ok' || echo 'no-tool'",
+		shellQuote(container), shellQuote(tool))
+	output, err := mgr.Execute(ctx, cmd, target)
+	if err != nil {
+		return err
+	}
+	switch {
+	case containsString(output, "no-docker"):
+		return fmt.Errorf("docker command not found on target")
+	case containsString(output, "ok"):
+		return nil
+	default:
+		return fmt.Errorf("%s not available in container %s", tool, container)
+	}
+}
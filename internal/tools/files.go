@@ -4,6 +4,7 @@ import (
 	"context"
 	"encoding/json"
 	"fmt"
+	"io"
 	"log"
 	"path/filepath"
 	"strings"
@@ -387,16 +388,29 @@ func createSyncHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 		destNode, _ := req.RequireString("dest_node")
 		destPath, _ := req.RequireString("dest_path")
 
-		content, err := mgr.ReadFile(ctx, sourcePath, sourceNode)
+		// Stream between the two nodes instead of buffering the whole file,
+		// so transfer size is bounded only by the remote disks, not our RAM.
+		src, err := mgr.OpenFile(ctx, sourcePath, sourceNode)
 		if err != nil {
 			return mcp.NewToolResultError(fmt.Sprintf("Failed to read from source: %v", err)), nil
 		}
+		defer src.Close()
 
-		if err := mgr.WriteFile(ctx, destPath, content, destNode); err != nil {
+		dst, err := mgr.CreateFile(ctx, destPath, destNode)
+		if err != nil {
+			return mcp.NewToolResultError(fmt.Sprintf("Failed to write to destination: %v", err)), nil
+		}
+
+		n, err := io.Copy(dst, src)
+		closeErr := dst.Close()
+		if err != nil {
 			return mcp.NewToolResultError(fmt.Sprintf("Failed to write to destination: %v", err)), nil
 		}
+		if closeErr != nil {
+			return mcp.NewToolResultError(fmt.Sprintf("Failed to write to destination: %v", closeErr)), nil
+		}
 
-		return mcp.NewToolResultText(fmt.Sprintf("Successfully synced %d bytes from %s to %s", len(content), sourceNode, destNode)), nil
+		return mcp.NewToolResultText(fmt.Sprintf("Successfully synced %d bytes from %s to %s", n, sourceNode, destNode)), nil
 	}
 }
 
@@ -4,6 +4,8 @@ import (
 	"context"
 	"fmt"
 	"log"
+	"sync"
+	"time"
 
 	"ssh-mcp/internal/ssh"
 
@@ -89,16 +91,11 @@ func registerMonitoringTools(s *server.MCPServer, pool *ssh.Pool) {
 	)
 }
 
-func createUsageHandler(pool *ssh.Pool) server.ToolHandlerFunc {
-	return func(ctx context.Context, req mcp.CallToolRequest) (*mcp.CallToolResult, error) {
-		mgr := getManager(ctx, pool)
-		if mgr == nil {
-			return mcp.NewToolResultError("No active session"), nil
-		}
-
-		target := req.GetString("target", "primary")
-
-		cmd := `
+// usageScript and diagnoseScript gather all of their sections in one
+// remote exec — a single SSH round-trip per call regardless of how many
+// metrics are reported. They live at package scope as fixed templates so
+// the handlers only ship them, never assemble them.
+const usageScript = `
 echo "=== LOAD AVERAGE ==="
 cat /proc/loadavg 2>/dev/null
 
@@ -110,11 +107,115 @@ echo ""
 echo "=== DISK ==="
 df -h / 2>/dev/null
 `
-		output, err := mgr.Execute(ctx, cmd, target)
+
+const diagnoseScript = `
+echo "=== SYSTEM HEALTH DIAGNOSTIC ==="
+echo ""
+
+echo "--- LOAD AVERAGE ---"
+LOAD=$(cat /proc/loadavg 2>/dev/null | awk '{print $1}')
+CPUS=$(nproc 2>/dev/null || echo 1)
+echo "Load (1min): $LOAD (CPUs: $CPUS)"
+if [ $(echo "$LOAD > $((CPUS * 2))" | bc 2>/dev/null) = 1 ] 2>/dev/null; then
+  echo "WARNING: High load detected!"
+fi
+echo ""
+
+echo "--- TOP CPU CONSUMERS ---"
+ps -eo pid,user,%cpu,%mem,comm --sort=-%cpu 2>/dev/null | head -n 6
+echo ""
+
+echo "--- OOM EVENTS ---"
+OOM=$(dmesg 2>/dev/null | grep -i 'out of memory' | tail -n 3)
+if [ -n "$OOM" ]; then
+  echo "$OOM"
+  echo "WARNING: OOM events found!"
+else
+  echo "No OOM events in dmesg"
+fi
+echo ""
+
+echo "--- DISK PRESSURE (>90%) ---"
+df -P 2>/dev/null | awk 'NR>1 && int($5)>=90 {print $5, $6}'
+if [ $(df -P 2>/dev/null | awk 'NR>1 && int($5)>=90' | wc -l) -eq 0 ]; then
+  echo "No partitions over 90%"
+fi
+echo ""
+
+echo "--- FAILED SERVICES ---"
+if command -v systemctl >/dev/null 2>&1; then
+  FAILED=$(systemctl --failed --no-legend --no-pager 2>/dev/null | head -n 5)
+  if [ -n "$FAILED" ]; then
+    echo "$FAILED"
+  else
+    echo "No failed services"
+  fi
+elif command -v rc-status >/dev/null 2>&1; then
+  rc-status --crashed 2>/dev/null | head -n 5 || echo "No crashed services"
+else
+  echo "Init system not detected"
+fi
+
+echo ""
+echo "=== END DIAGNOSTIC ==="
+`
+
+// usage is a natural target for tight polling loops, and every call is
+// a full SSH round-trip for numbers that barely move second to second.
+// Reports are cached per (manager, target) for a short TTL — the same
+// pattern as the tool-probe cache — so rapid polls reuse the last
+// report instead of hammering the connection.
+const usageCacheTTL = 2 * time.Second
+
+type usageCacheKey struct {
+	mgr    *ssh.Manager
+	target string
+}
+
+type usageCacheEntry struct {
+	output  string
+	fetched time.Time
+}
+
+var (
+	usageCacheMu sync.Mutex
+	usageCache   = make(map[usageCacheKey]usageCacheEntry)
+)
+
+func createUsageHandler(pool *ssh.Pool) server.ToolHandlerFunc {
+	return func(ctx context.Context, req mcp.CallToolRequest) (*mcp.CallToolResult, error) {
+		mgr := getManager(ctx, pool)
+		if mgr == nil {
+			return mcp.NewToolResultError("No active session"), nil
+		}
+
+		target := req.GetString("target", "primary")
+
+		key := usageCacheKey{mgr: mgr, target: target}
+		usageCacheMu.Lock()
+		entry, ok := usageCache[key]
+		usageCacheMu.Unlock()
+		if ok && time.Since(entry.fetched) < usageCacheTTL {
+			return mcp.NewToolResultText(entry.output), nil
+		}
+
+		output, err := mgr.Execute(ctx, usageScript, target)
 		if err != nil {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
 
+		// Sweep expired entries on insert so reports (and manager
+		// pointers) for closed sessions don't accumulate for the life
+		// of the process.
+		usageCacheMu.Lock()
+		for k, e := range usageCache {
+			if time.Since(e.fetched) >= usageCacheTTL {
+				delete(usageCache, k)
+			}
+		}
+		usageCache[key] = usageCacheEntry{output: output, fetched: time.Now()}
+		usageCacheMu.Unlock()
+
 		return mcp.NewToolResultText(output), nil
 	}
 }
@@ -270,58 +371,7 @@ func createDiagnoseHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 
 		target := req.GetString("target", "primary")
 
-		cmd := `
-echo "=== SYSTEM HEALTH DIAGNOSTIC ==="
-echo ""
-
-echo "--- LOAD AVERAGE ---"
-LOAD=$(cat /proc/loadavg 2>/dev/null | awk '{print $1}')
-CPUS=$(nproc 2>/dev/null || echo 1)
-echo "Load (1min): $LOAD (CPUs: $CPUS)"
-if [ $(echo "$LOAD > $((CPUS * 2))" | bc 2>/dev/null) = 1 ] 2>/dev/null; then
-  echo "WARNING: High load detected!"
-fi
-echo ""
-
-echo "--- TOP CPU CONSUMERS ---"
-ps -eo pid,user,%cpu,%mem,comm --sort=-%cpu 2>/dev/null | head -n 6
-echo ""
-
-echo "--- OOM EVENTS ---"
-OOM=$(dmesg 2>/dev/null | grep -i 'out of memory' | tail -n 3)
-if [ -n "$OOM" ]; then
-  echo "$OOM"
-  echo "WARNING: OOM events found!"
-else
-  echo "No OOM events in dmesg"
-fi
-echo ""
-
-echo "--- DISK PRESSURE (>90%) ---"
-df -P 2>/dev/null | awk 'NR>1 && int($5)>=90 {print $5, $6}'
-if [ $(df -P 2>/dev/null | awk 'NR>1 && int($5)>=90' | wc -l) -eq 0 ]; then
-  echo "No partitions over 90%"
-fi
-echo ""
-
-echo "--- FAILED SERVICES ---"
-if command -v systemctl >/dev/null 2>&1; then
-  FAILED=$(systemctl --failed --no-legend --no-pager 2>/dev/null | head -n 5)
-  if [ -n "$FAILED" ]; then
-    echo "$FAILED"
-  else
-    echo "No failed services"
-  fi
-elif command -v rc-status >/dev/null 2>&1; then
-  rc-status --crashed 2>/dev/null | head -n 5 || echo "No crashed services"
-else
-  echo "Init system not detected"
-fi
-
-echo ""
-echo "=== END DIAGNOSTIC ==="
-`
-		output, err := mgr.Execute(ctx, cmd, target)
+		output, err := mgr.Execute(ctx, diagnoseScript, target)
 		if err != nil {
 			log.Printf("[Tool:diagnose] Error: %v", err)
 			return mcp.NewToolResultError(err.Error()), nil
@@ -0,0 +1,1077 @@
+// Package tools provides MCP tool implementations.
+// pcap.go contains server-side SIP pcap fetch and analysis helpers.
+// Like validate.go, the heavy lifting happens on the MCP server: the remote
+// host only needs docker — no tshark or sngrep required in the container.
+package tools
+
+import (
+	"bytes"
+	"context"
+	"encoding/binary"
+	"errors"
+	"fmt"
+	"io"
+	"sort"
+	"strconv"
+	"strings"
+	"time"
+
+	"ssh-mcp/internal/ssh"
+)
+
+// errPCAPTooLarge marks captures over the analysis cap so callers can
+// fall back to remote aggregation instead of failing outright.
+var errPCAPTooLarge = errors.New("pcap exceeds analysis limit")
+
+// fetchPCAPFromContainer copies a pcap out of a container to a host temp
+// file and streams it back over SFTP as raw bytes. The size cap is enforced
+// during the read (cap+1 bytes requested), so no separate remote stat
+// round-trip is needed. Cleanup of the host temp file is scheduled as a
+// detached delayed rm inside the same copy command, so the whole fetch
+// costs one exec round-trip plus the SFTP read instead of paying a second
+// exec just to remove the file afterwards.
+func fetchPCAPFromContainer(ctx context.Context, mgr *ssh.Manager, container, pcapFile, target string, maxBytes int64) ([]byte, error) {
+	hostPath := fmt.Sprintf("/tmp/voip_fetch_%d.pcap", time.Now().UnixNano())
+
+	// The background rm must redirect its output, or the session would
+	// stay open until the sleep finishes. The trailing true keeps the
+	// command valid when the executor appends to it.
+	cpCmd := fmt.Sprintf("docker cp %s:%s %s >/dev/null 2>&1 && echo ok || echo fail; { sleep 120; rm -f %s; } >/dev/null 2>&1 & true",
+		shellQuote(container), shellQuote(pcapFile), shellQuote(hostPath), shellQuote(hostPath))
+	output, err := mgr.Execute(ctx, cpCmd, target)
+	if err != nil {
+		return nil, err
+	}
+	if !containsString(output, "ok") {
+		return nil, fmt.Errorf("failed to copy %s from container %s", pcapFile, container)
+	}
+
+	return fetchPCAPFromHost(ctx, mgr, hostPath, target, maxBytes)
+}
+
+// fetchPCAPFromHost streams a pcap that already lives on the remote host
+// back over SFTP, enforcing the size cap during the read (cap+1 bytes
+// requested) so no separate stat round-trip is needed.
+func fetchPCAPFromHost(ctx context.Context, mgr *ssh.Manager, hostPath, target string, maxBytes int64) ([]byte, error) {
+	file, err := mgr.OpenFile(ctx, hostPath, target)
+	if err != nil {
+		return nil, err
+	}
+	defer file.Close()
+
+	data, err := io.ReadAll(io.LimitReader(file, maxBytes+1))
+	if err != nil {
+		return nil, fmt.Errorf("failed to read pcap: %w", err)
+	}
+	if int64(len(data)) > maxBytes {
+		return nil, fmt.Errorf("%w (%d byte limit) — capture less or analyze it on the remote host", errPCAPTooLarge, maxBytes)
+	}
+
+	return data, nil
+}
+
+// sipMessage is one parsed SIP request or response from a capture.
+type sipMessage struct {
+	Timestamp  int64  // epoch microseconds, straight from the record header
+	Src        string // ip:port
+	Dst        string // ip:port
+	Transport  string // "udp" or "tcp"
+	Method     string // request method, empty for responses
+	RequestURI string // request URI, empty for responses
+	Status     int    // response status code, 0 for requests
+	StatusLine string // full status line for responses
+	CallID     string
+	From       string
+	To         string
+	CSeq       string
+	Body       string
+}
+
+// sipMethods are the request methods recognized on the wire.
+var sipMethods = [][]byte{
+	[]byte("INVITE "),
+	[]byte("REGISTER "),
+	[]byte("ACK "),
+	[]byte("BYE "),
+	[]byte("CANCEL "),
+	[]byte("OPTIONS "),
+	[]byte("PRACK "),
+	[]byte("UPDATE "),
+	[]byte("MESSAGE "),
+	[]byte("SUBSCRIBE "),
+	[]byte("NOTIFY "),
+	[]byte("REFER "),
+	[]byte("PUBLISH "),
+	[]byte("INFO "),
+}
+
+var sipStatusPrefix = []byte("SIP/2.0 ")
+
+// sipPrefixByFirstByte indexes the recognized start-line prefixes by their
+// first byte. The per-packet check becomes one table load plus at most two
+// prefix comparisons instead of fifteen, which matters because this runs
+// for every UDP datagram and every TCP message boundary in a capture.
+var sipPrefixByFirstByte [256][][]byte
+
+func init() {
+	sipPrefixByFirstByte[sipStatusPrefix[0]] = append(sipPrefixByFirstByte[sipStatusPrefix[0]], sipStatusPrefix)
+	for _, m := range sipMethods {
+		sipPrefixByFirstByte[m[0]] = append(sipPrefixByFirstByte[m[0]], m)
+	}
+}
+
+// looksLikeSIP reports whether a payload starts with a SIP request line or
+// status line.
+func looksLikeSIP(payload []byte) bool {
+	if len(payload) == 0 {
+		return false
+	}
+	for _, p := range sipPrefixByFirstByte[payload[0]] {
+		if bytes.HasPrefix(payload, p) {
+			return true
+		}
+	}
+	return false
+}
+
+// pcap file format constants. The global header is 24 bytes, each record
+// header 16 bytes; the magic number encodes byte order and timestamp unit.
+const (
+	pcapMagicMicro   = 0xa1b2c3d4
+	pcapMagicNano    = 0xa1b23c4d
+	pcapGlobalHdrLen = 24
+	pcapRecordHdrLen = 16
+	linkTypeEthernet = 1
+	linkTypeSLL      = 113 // Linux cooked capture, produced by -i any
+	linkTypeSLL2     = 276
+)
+
+// pcapByteOrder inspects the magic number, returning the byte order and
+// whether timestamps are in nanoseconds.
+func pcapByteOrder(data []byte) (binary.ByteOrder, bool, error) {
+	if len(data) < pcapGlobalHdrLen {
+		return nil, false, errors.New("truncated pcap: missing global header")
+	}
+	switch binary.LittleEndian.Uint32(data[:4]) {
+	case pcapMagicMicro:
+		return binary.LittleEndian, false, nil
+	case pcapMagicNano:
+		return binary.LittleEndian, true, nil
+	}
+	switch binary.BigEndian.Uint32(data[:4]) {
+	case pcapMagicMicro:
+		return binary.BigEndian, false, nil
+	case pcapMagicNano:
+		return binary.BigEndian, true, nil
+	}
+	return nil, false, fmt.Errorf("not a pcap file (magic 0x%08x)", binary.BigEndian.Uint32(data[:4]))
+}
+
+// sipParseOpts controls what the parser materializes per message. Passed
+// by value through the decode chain so callers that only need headers
+// don't pay for the rest.
+type sipParseOpts struct {
+	// wantBody keeps message bodies. Only SDP extraction reads them;
+	// leaving this false skips a per-message string copy that on large
+	// captures is most of the parser's allocations.
+	wantBody bool
+	// callID drops messages for other calls as soon as their Call-ID
+	// header is known, before any body is materialized. Filtering to one
+	// call out of hundreds skips nearly all downstream work.
+	callID string
+}
+
+// parsePCAPBytes decodes SIP messages out of a raw pcap buffer.
+//
+// Headers are sliced in place: record, Ethernet, IP and transport headers
+// are read with offset arithmetic over the one buffer, and payload bytes are
+// only materialized for packets that actually carry SIP. TCP payloads on SIP
+// ports are reassembled per flow before extraction.
+//
+// Each handler already runs on its own goroutine, so the parse never
+// blocks other MCP requests; the loop checks ctx periodically so a
+// cancelled request stops burning CPU mid-capture instead of running
+// to completion.
+//
+// The parse is deliberately single-pass rather than sharded across
+// goroutines: captures are capped at DefaultPCAPLimit, the scan is
+// memory-bandwidth bound, and TCP reassembly requires in-order
+// delivery per flow — a worker pool would add a merge step and
+// per-flow ordering for a sub-millisecond win at this input size.
+func parsePCAPBytes(ctx context.Context, data []byte, opts sipParseOpts) ([]sipMessage, error) {
+	order, nanos, err := pcapByteOrder(data)
+	if err != nil {
+		return nil, err
+	}
+
+	linkType := order.Uint32(data[20:24])
+	if !supportedLinkType(linkType) {
+		return nil, fmt.Errorf("unsupported pcap link type %d (Ethernet and Linux cooked captures supported)", linkType)
+	}
+
+	var messages []sipMessage
+	tcpStreams := make(map[string]*tcpStream)
+	addrCache := make(map[uint64]string)
+
+	records := 0
+	off := pcapGlobalHdrLen
+	for off+pcapRecordHdrLen <= len(data) {
+		if records++; records&0x0fff == 0 {
+			if err := ctx.Err(); err != nil {
+				return nil, err
+			}
+		}
+		tsSec := order.Uint32(data[off : off+4])
+		tsFrac := order.Uint32(data[off+4 : off+8])
+		capLen := int(order.Uint32(data[off+8 : off+12]))
+		off += pcapRecordHdrLen
+
+		if capLen <= 0 || off+capLen > len(data) {
+			break // truncated record, stop cleanly
+		}
+		frame := data[off : off+capLen]
+		off += capLen
+
+		ts := int64(tsSec) * 1_000_000
+		if nanos {
+			ts += int64(tsFrac) / 1000
+		} else {
+			ts += int64(tsFrac)
+		}
+
+		messages = decodeFrame(frame, linkType, ts, tcpStreams, addrCache, messages, opts)
+	}
+
+	return messages, nil
+}
+
+// supportedLinkType reports whether the parser understands a pcap's
+// link-layer framing.
+func supportedLinkType(linkType uint32) bool {
+	return linkType == linkTypeEthernet || linkType == linkTypeSLL || linkType == linkTypeSLL2
+}
+
+// ipv4Packet strips link-layer framing (Ethernet with optional VLAN tag,
+// or Linux cooked as written by tcpdump -i any), returning the IPv4
+// packet and its header length, or nil when the frame is not
+// first-fragment IPv4. The header length rides along because validation
+// already computed it; callers shouldn't re-derive it per packet.
+func ipv4Packet(frame []byte, linkType uint32) ([]byte, int) {
+	var etOff, ipStart int
+	switch linkType {
+	case linkTypeEthernet:
+		etOff, ipStart = 12, 14
+	case linkTypeSLL: // 16-byte header, protocol in the last two bytes
+		etOff, ipStart = 14, 16
+	case linkTypeSLL2: // 20-byte header, protocol in the first two bytes
+		etOff, ipStart = 0, 20
+	default:
+		return nil, 0
+	}
+	if len(frame) < ipStart {
+		return nil, 0
+	}
+
+	etherType := binary.BigEndian.Uint16(frame[etOff : etOff+2])
+	if etherType == 0x8100 && linkType != linkTypeSLL2 { // 802.1Q VLAN tag
+		if len(frame) < ipStart+4 {
+			return nil, 0
+		}
+		etherType = binary.BigEndian.Uint16(frame[ipStart+2 : ipStart+4])
+		ipStart += 4
+	}
+	if etherType != 0x0800 { // IPv4 only
+		return nil, 0
+	}
+
+	ip := frame[ipStart:]
+	if len(ip) < 20 || ip[0]>>4 != 4 {
+		return nil, 0
+	}
+	ihl := int(ip[0]&0x0f) * 4
+	if ihl < 20 || len(ip) < ihl {
+		return nil, 0
+	}
+	if binary.BigEndian.Uint16(ip[6:8])&0x1fff != 0 {
+		return nil, 0 // non-first fragment
+	}
+
+	return ip, ihl
+}
+
+// isSIPPort reports whether p is a SIP signaling port the TCP path
+// reassembles. A single switch keeps the port set in one place instead
+// of pairs of comparisons scattered through the decode branch, and the
+// compiler lowers it to the same two compares.
+func isSIPPort(p uint16) bool {
+	switch p {
+	case SIPTCPPort, SIPTLSPort:
+		return true
+	}
+	return false
+}
+
+// decodeFrame walks one link-layer frame down to the SIP payload,
+// appending any parsed messages.
+func decodeFrame(frame []byte, linkType uint32, ts int64, tcpStreams map[string]*tcpStream, addrCache map[uint64]string, messages []sipMessage, opts sipParseOpts) []sipMessage {
+	ip, ihl := ipv4Packet(frame, linkType)
+	if ip == nil {
+		return messages
+	}
+
+	proto := ip[9]
+	transport := ip[ihl:]
+
+	switch proto {
+	case 17: // UDP
+		if len(transport) < 8 {
+			return messages
+		}
+		payload := transport[8:]
+		if !looksLikeSIP(payload) {
+			return messages
+		}
+		// Addresses are only rendered for packets that carry SIP, so the
+		// vast majority of datagrams never pay for string formatting.
+		src := formatAddr(addrCache, ip[12:16], binary.BigEndian.Uint16(transport[0:2]))
+		dst := formatAddr(addrCache, ip[16:20], binary.BigEndian.Uint16(transport[2:4]))
+		if msg, ok := parseSIPMessage(payload, ts, src, dst, "udp", opts); ok {
+			messages = append(messages, msg)
+		}
+
+	case 6: // TCP
+		if len(transport) < 20 {
+			return messages
+		}
+		srcPort := binary.BigEndian.Uint16(transport[0:2])
+		dstPort := binary.BigEndian.Uint16(transport[2:4])
+		dataOff := int(transport[12]>>4) * 4
+		if dataOff < 20 || len(transport) < dataOff {
+			return messages
+		}
+		if !isSIPPort(srcPort) && !isSIPPort(dstPort) {
+			return messages
+		}
+		payload := transport[dataOff:]
+		if len(payload) == 0 {
+			return messages
+		}
+		src := formatAddr(addrCache, ip[12:16], srcPort)
+		dst := formatAddr(addrCache, ip[16:20], dstPort)
+		key := src + ">" + dst
+		stream, ok := tcpStreams[key]
+		if (srcPort == SIPTLSPort || dstPort == SIPTLSPort) &&
+			(!ok || len(stream.buf) == 0) {
+			// Port 5061 traffic is normally TLS: buffering encrypted
+			// segments would grow stream state and feed the resync scan
+			// for nothing. Probe only segments that would start a new
+			// stream buffer — encrypted flows never establish one, while
+			// continuation segments of a cleartext message already being
+			// reassembled must pass through unprobed or multi-segment
+			// messages lose their tails.
+			if !looksLikeSIP(payload) {
+				return messages
+			}
+		}
+		if !ok {
+			stream = &tcpStream{buf: make([]byte, 0, 8192)}
+			tcpStreams[key] = stream
+		}
+		stream.buf = append(stream.buf, payload...)
+		messages = stream.extract(ts, src, dst, messages, opts)
+	}
+
+	return messages
+}
+
+// formatAddr renders ip:port, memoized across the parse: captures
+// concentrate on a handful of endpoints, so each distinct address is
+// formatted exactly once and every later packet reuses the same string.
+func formatAddr(cache map[uint64]string, ipBytes []byte, port uint16) string {
+	key := addrKey(ipBytes, port)
+	if s, ok := cache[key]; ok {
+		return s
+	}
+	s := formatAddrKey(key)
+	cache[key] = s
+	return s
+}
+
+// addrKey packs an IPv4 address and port into one integer, usable both as
+// a memoization key and as a set member that defers all string work.
+func addrKey(ipBytes []byte, port uint16) uint64 {
+	return uint64(binary.BigEndian.Uint32(ipBytes))<<16 | uint64(port)
+}
+
+// formatAddrKey renders a packed addrKey as ip:port, building the string
+// with strconv.AppendUint into a stack-sized buffer rather than going
+// through fmt's reflection.
+func formatAddrKey(key uint64) string {
+	buf := make([]byte, 0, 21) // "255.255.255.255:65535"
+	for shift := 40; shift >= 16; shift -= 8 {
+		if shift < 40 {
+			buf = append(buf, '.')
+		}
+		buf = strconv.AppendUint(buf, (key>>uint(shift))&0xff, 10)
+	}
+	buf = append(buf, ':')
+	buf = strconv.AppendUint(buf, key&0xffff, 10)
+	return string(buf)
+}
+
+// formatAddrKeySet renders a packed endpoint set as sorted ip:port
+// strings — one formatting pass over the unique endpoints instead of
+// per-packet string building and linear dedup scans.
+func formatAddrKeySet(set map[uint64]struct{}) []string {
+	if len(set) == 0 {
+		return nil
+	}
+	keys := make([]uint64, 0, len(set))
+	for key := range set {
+		keys = append(keys, key)
+	}
+	sort.Slice(keys, func(i, j int) bool { return keys[i] < keys[j] })
+	out := make([]string, len(keys))
+	for i, key := range keys {
+		out[i] = formatAddrKey(key)
+	}
+	return out
+}
+
+// Shared terminator patterns. All terminator searches go through
+// bytes.Index/IndexByte, which lower to the runtime's vectorized
+// (memchr-style) scanners, so each lookup is one linear pass in
+// assembly rather than byte-at-a-time Go code.
+var crlfcrlf = []byte("\r\n\r\n")
+
+// tcpStream accumulates one direction of a SIP-over-TCP flow. scanStart
+// remembers how far the header-terminator search has progressed, so each
+// new segment only scans bytes it could possibly complete instead of
+// rescanning the whole buffer from offset zero — O(N) instead of O(N²)
+// over the life of a chatty connection.
+type tcpStream struct {
+	buf       []byte
+	scanStart int
+}
+
+// extract consumes complete SIP messages from the front of the stream
+// buffer, appending them to messages.
+func (s *tcpStream) extract(ts int64, src, dst string, messages []sipMessage, opts sipParseOpts) []sipMessage {
+	for {
+		// Discard leading bytes until the buffer starts at a message
+		// boundary (keep-alives and mid-stream joins land here).
+		if len(s.buf) > 0 && !looksLikeSIP(s.buf) {
+			idx := bytes.Index(s.buf, crlf)
+			if idx < 0 {
+				if len(s.buf) > 64*1024 {
+					s.buf = s.buf[:0]
+				}
+				s.scanStart = 0
+				return messages
+			}
+			s.buf = s.buf[idx+2:]
+			s.scanStart = 0
+			continue
+		}
+
+		searchFrom := s.scanStart
+		if searchFrom > len(s.buf) {
+			searchFrom = len(s.buf)
+		}
+		idx := bytes.Index(s.buf[searchFrom:], crlfcrlf)
+		if idx < 0 {
+			// The terminator could still straddle the next segment, so
+			// only the trailing 3 bytes need rescanning.
+			if n := len(s.buf) - 3; n > 0 {
+				s.scanStart = n
+			} else {
+				s.scanStart = 0
+			}
+			return messages
+		}
+		headerEnd := searchFrom + idx
+
+		head := s.buf[:headerEnd]
+		bodyLen := contentLengthFromHeader(head)
+		totalLen := headerEnd + len(crlfcrlf) + bodyLen
+		if len(s.buf) < totalLen {
+			// Body not fully captured yet; resume at the known header end.
+			s.scanStart = headerEnd
+			return messages
+		}
+
+		body := s.buf[headerEnd+len(crlfcrlf) : totalLen]
+		if msg, ok := parseSIPHeader(head, body, ts, src, dst, "tcp", opts); ok {
+			messages = append(messages, msg)
+		}
+		s.buf = s.buf[totalLen:]
+		s.scanStart = 0
+	}
+}
+
+var crlf = []byte("\r\n")
+
+// nextLine returns the first CRLF-terminated line of b and the remainder
+// after the terminator; an unterminated final line is returned whole.
+func nextLine(b []byte) (line, rest []byte) {
+	if i := bytes.Index(b, crlf); i >= 0 {
+		return b[:i], b[i+2:]
+	}
+	return b, nil
+}
+
+// contentLengthFromHeader finds the Content-Length value in a raw header
+// block, returning 0 when absent or malformed.
+func contentLengthFromHeader(head []byte) int {
+	for len(head) > 0 {
+		var line []byte
+		line, head = nextLine(head)
+		name, value, ok := cutHeaderLine(line)
+		if !ok {
+			continue
+		}
+		if strings.EqualFold(name, "Content-Length") || name == "l" || name == "L" {
+			n, err := strconv.Atoi(value)
+			if err == nil && n >= 0 {
+				return n
+			}
+			return 0
+		}
+	}
+	return 0
+}
+
+// cutHeaderLine splits "Name: value" into trimmed name and value.
+func cutHeaderLine(line []byte) (name, value string, ok bool) {
+	idx := bytes.IndexByte(line, ':')
+	if idx <= 0 {
+		return "", "", false
+	}
+	return strings.TrimSpace(string(line[:idx])), strings.TrimSpace(string(line[idx+1:])), true
+}
+
+// parseSIPMessage splits one complete SIP payload into header block and
+// body, then parses it. The TCP path calls parseSIPHeader directly since
+// reassembly has already located the header/body boundary.
+func parseSIPMessage(payload []byte, ts int64, src, dst, transport string, opts sipParseOpts) (sipMessage, bool) {
+	var head, body []byte
+	if headerEnd := bytes.Index(payload, crlfcrlf); headerEnd >= 0 {
+		head = payload[:headerEnd]
+		body = payload[headerEnd+len(crlfcrlf):]
+	} else {
+		head = payload
+	}
+	return parseSIPHeader(head, body, ts, src, dst, transport, opts)
+}
+
+// parseSIPHeader parses a SIP message from its raw header block and body.
+// Lines are walked with an in-place cursor instead of materializing a
+// per-message [][]byte — header splitting was the parser's densest
+// allocation site, and the slice bought nothing the cursor doesn't.
+func parseSIPHeader(head, body []byte, ts int64, src, dst, transport string, opts sipParseOpts) (sipMessage, bool) {
+	msg := sipMessage{
+		Timestamp: ts,
+		Src:       src,
+		Dst:       dst,
+		Transport: transport,
+	}
+
+	startBytes, rest := nextLine(head)
+	if len(startBytes) == 0 {
+		return msg, false
+	}
+
+	startLine := string(startBytes)
+	if strings.HasPrefix(startLine, "SIP/2.0 ") {
+		msg.StatusLine = startLine
+		rest := startLine[len("SIP/2.0 "):]
+		if idx := strings.IndexByte(rest, ' '); idx > 0 {
+			rest = rest[:idx]
+		}
+		code, err := strconv.Atoi(rest)
+		if err != nil {
+			return msg, false
+		}
+		msg.Status = code
+	} else {
+		parts := strings.SplitN(startLine, " ", 3)
+		if len(parts) < 2 {
+			return msg, false
+		}
+		msg.Method = parts[0]
+		msg.RequestURI = parts[1]
+	}
+
+	for len(rest) > 0 {
+		var line []byte
+		line, rest = nextLine(rest)
+		name, value, ok := cutHeaderLine(line)
+		if !ok {
+			continue
+		}
+		// Dispatch on name length first so each line costs one switch plus
+		// at most two case-insensitive comparisons, instead of testing
+		// every header of interest against every line.
+		switch len(name) {
+		case 1:
+			switch name {
+			case "i", "I":
+				msg.CallID = value
+			case "f", "F":
+				msg.From = value
+			case "t", "T":
+				msg.To = value
+			}
+		case 2:
+			if strings.EqualFold(name, "To") {
+				msg.To = value
+			}
+		case 4:
+			if strings.EqualFold(name, "From") {
+				msg.From = value
+			} else if strings.EqualFold(name, "CSeq") {
+				msg.CSeq = value
+			}
+		case 7:
+			if strings.EqualFold(name, "Call-ID") {
+				msg.CallID = value
+			}
+		}
+	}
+
+	if opts.callID != "" && msg.CallID != opts.callID {
+		return msg, false
+	}
+	if opts.wantBody && len(body) > 0 {
+		msg.Body = string(body)
+	}
+
+	return msg, true
+}
+
+// formatSIPTimestamp renders an epoch-microseconds timestamp for output.
+func formatSIPTimestamp(ts int64) string {
+	return time.Unix(ts/1_000_000, (ts%1_000_000)*1000).UTC().Format("2006-01-02 15:04:05.000000")
+}
+
+// summarizeSIPMessage renders one message as a single flow line.
+func summarizeSIPMessage(m *sipMessage) string {
+	what := m.StatusLine
+	if m.Method != "" {
+		what = m.Method + " " + m.RequestURI
+	}
+	return fmt.Sprintf("%s  %s -> %s  [%s]  %s  Call-ID: %s",
+		formatSIPTimestamp(m.Timestamp), m.Src, m.Dst, m.Transport, what, m.CallID)
+}
+
+// writeSIPMessage renders one message into sb. Detail mode adds
+// From/To/CSeq under the flow line.
+func writeSIPMessage(sb *strings.Builder, m *sipMessage, summaryOnly bool) {
+	sb.WriteString(summarizeSIPMessage(m))
+	sb.WriteString("\n")
+	if !summaryOnly {
+		if m.From != "" {
+			sb.WriteString(fmt.Sprintf("    From: %s\n", m.From))
+		}
+		if m.To != "" {
+			sb.WriteString(fmt.Sprintf("    To: %s\n", m.To))
+		}
+		if m.CSeq != "" {
+			sb.WriteString(fmt.Sprintf("    CSeq: %s\n", m.CSeq))
+		}
+	}
+}
+
+// formatSIPMessages renders parsed messages for tool output.
+func formatSIPMessages(msgs []sipMessage, summaryOnly bool) string {
+	var sb strings.Builder
+	for i := range msgs {
+		writeSIPMessage(&sb, &msgs[i], summaryOnly)
+	}
+	return strings.TrimRight(sb.String(), "\n")
+}
+
+// callGroup is the ordered set of messages sharing one Call-ID, plus the
+// per-call fields the tools project out of it.
+type callGroup struct {
+	CallID     string
+	Caller     string // user part of From on the first request
+	Callee     string // user part of To on the first request
+	LastStatus string // most recent response status line
+	LastCode   int    // most recent response status code
+	Messages   []*sipMessage
+}
+
+// groupByCallID buckets messages by Call-ID in a single pass, preserving
+// the capture order of both calls and the messages within them. Messages
+// arrive already time-ordered from the parser, so no per-group sort or
+// merge step is needed afterwards. The per-call projection (caller,
+// callee, last status) is filled during the same pass rather than by
+// re-scanning each group later.
+func groupByCallID(msgs []sipMessage) []*callGroup {
+	byID := make(map[string]*callGroup, 16)
+	users := make(uriCache)
+	var groups []*callGroup
+	for i := range msgs {
+		m := &msgs[i]
+		g := byID[m.CallID]
+		if g == nil {
+			g = &callGroup{CallID: m.CallID}
+			byID[m.CallID] = g
+			groups = append(groups, g)
+		}
+		g.Messages = append(g.Messages, m)
+		if m.Method != "" {
+			if g.Caller == "" {
+				g.Caller = users.user(m.From)
+				g.Callee = users.user(m.To)
+			}
+		} else {
+			g.LastStatus = m.StatusLine
+			g.LastCode = m.Status
+		}
+	}
+	return groups
+}
+
+// formatCallFlows renders messages grouped per call.
+func formatCallFlows(groups []*callGroup, summaryOnly bool) string {
+	var sb strings.Builder
+	for _, g := range groups {
+		sb.WriteString(fmt.Sprintf("=== Call-ID: %s (%d messages)", g.CallID, len(g.Messages)))
+		if g.Caller != "" || g.Callee != "" {
+			sb.WriteString(fmt.Sprintf("  %s -> %s", g.Caller, g.Callee))
+		}
+		if g.LastStatus != "" {
+			sb.WriteString(fmt.Sprintf("  last: %s", g.LastStatus))
+		}
+		sb.WriteString(" ===\n")
+		for _, m := range g.Messages {
+			writeSIPMessage(&sb, m, summaryOnly)
+		}
+		sb.WriteString("\n")
+	}
+	return strings.TrimRight(sb.String(), "\n")
+}
+
+// extractSIPURI pulls the sip:/sips: URI out of a header value like
+// `"Alice" <sip:alice@host>;tag=x`, without the trailing params.
+func extractSIPURI(header string) string {
+	idx := strings.Index(header, "sips:")
+	if idx < 0 {
+		idx = strings.Index(header, "sip:")
+	}
+	if idx < 0 {
+		return ""
+	}
+	uri := header[idx:]
+	if end := strings.IndexAny(uri, ">;, \t"); end >= 0 {
+		uri = uri[:end]
+	}
+	return uri
+}
+
+// extractUserFromURI returns the user part of a sip:/sips: URI.
+func extractUserFromURI(uri string) string {
+	rest := strings.TrimPrefix(uri, "sips:")
+	if rest == uri {
+		rest = strings.TrimPrefix(uri, "sip:")
+	}
+	if at := strings.IndexByte(rest, '@'); at >= 0 {
+		return rest[:at]
+	}
+	return ""
+}
+
+// uriCache memoizes header-value → user extraction within one analysis
+// pass. From/To values repeat verbatim for every message in a dialog, so
+// after the first message of a call each lookup is a single map hit. A
+// plain per-pass map keeps this lock-free (one analysis runs per request)
+// where a shared LRU would need synchronization.
+type uriCache map[string]string
+
+func (c uriCache) user(header string) string {
+	if u, ok := c[header]; ok {
+		return u
+	}
+	u := extractUserFromURI(extractSIPURI(header))
+	c[header] = u
+	return u
+}
+
+// filterSIPMessages applies the call-id / phone-number filters used by the
+// call flow tool.
+func filterSIPMessages(msgs []sipMessage, callID, phoneNumber string) []sipMessage {
+	if callID == "" && phoneNumber == "" {
+		return msgs
+	}
+	users := make(uriCache)
+	filtered := make([]sipMessage, 0, len(msgs))
+	for _, m := range msgs {
+		if callID != "" && m.CallID != callID {
+			continue
+		}
+		if phoneNumber != "" &&
+			users.user(m.From) != phoneNumber &&
+			users.user(m.To) != phoneNumber &&
+			!strings.Contains(m.From, phoneNumber) &&
+			!strings.Contains(m.To, phoneNumber) &&
+			!strings.Contains(m.RequestURI, phoneNumber) {
+			continue
+		}
+		filtered = append(filtered, m)
+	}
+	return filtered
+}
+
+// portCount pairs a UDP port with its packet count.
+type portCount struct {
+	Port  int `json:"port"`
+	Count int `json:"count"`
+}
+
+// rtpCountResult aggregates UDP traffic observed in a port range.
+type rtpCountResult struct {
+	Total        int
+	TopPorts     []portCount
+	Sources      []string
+	Destinations []string
+}
+
+// parsePortRange parses a "lo-hi" port range string once, up front,
+// falling back to the given defaults for anything it cannot parse and
+// normalizing an inverted range. The counting loop then only ever
+// compares two ints per packet.
+func parsePortRange(s string, defLo, defHi int) (int, int) {
+	lo, hi := defLo, defHi
+	if i := strings.IndexByte(s, '-'); i > 0 {
+		if n, err := strconv.Atoi(strings.TrimSpace(s[:i])); err == nil && n > 0 && n <= 65535 {
+			lo = n
+		}
+		if n, err := strconv.Atoi(strings.TrimSpace(s[i+1:])); err == nil && n > 0 && n <= 65535 {
+			hi = n
+		}
+	}
+	if lo > hi {
+		lo, hi = hi, lo
+	}
+	return lo, hi
+}
+
+// countUDPPacketsInRange tallies UDP packets whose source or destination
+// port falls inside [startPort, endPort]. Counts land in a preallocated
+// per-port table indexed directly by port number — O(1) bumps per packet,
+// then one sweep over the range to rank active ports. Endpoints are
+// deduped the same way: packed-integer set inserts per packet, with all
+// string formatting deferred to one pass over the unique set at the end.
+func countUDPPacketsInRange(data []byte, startPort, endPort int) (rtpCountResult, error) {
+	var res rtpCountResult
+
+	order, _, err := pcapByteOrder(data)
+	if err != nil {
+		return res, err
+	}
+	linkType := order.Uint32(data[20:24])
+	if !supportedLinkType(linkType) {
+		return res, fmt.Errorf("unsupported pcap link type %d (Ethernet and Linux cooked captures supported)", linkType)
+	}
+
+	counts := make([]int, 65536)
+	srcSeen := make(map[uint64]struct{})
+	dstSeen := make(map[uint64]struct{})
+
+	off := pcapGlobalHdrLen
+	for off+pcapRecordHdrLen <= len(data) {
+		capLen := int(order.Uint32(data[off+8 : off+12]))
+		off += pcapRecordHdrLen
+		if capLen <= 0 || off+capLen > len(data) {
+			break
+		}
+		frame := data[off : off+capLen]
+		off += capLen
+
+		ip, ihl := ipv4Packet(frame, linkType)
+		if ip == nil {
+			continue
+		}
+		if ip[9] != 17 { // UDP only
+			continue
+		}
+		transport := ip[ihl:]
+		if len(transport) < 8 {
+			continue
+		}
+		srcPort := int(binary.BigEndian.Uint16(transport[0:2]))
+		dstPort := int(binary.BigEndian.Uint16(transport[2:4]))
+
+		matched := false
+		if srcPort >= startPort && srcPort <= endPort {
+			counts[srcPort]++
+			matched = true
+		} else if dstPort >= startPort && dstPort <= endPort {
+			counts[dstPort]++
+			matched = true
+		}
+		if !matched {
+			continue
+		}
+
+		res.Total++
+		srcSeen[addrKey(ip[12:16], uint16(srcPort))] = struct{}{}
+		dstSeen[addrKey(ip[16:20], uint16(dstPort))] = struct{}{}
+	}
+
+	res.Sources = formatAddrKeySet(srcSeen)
+	res.Destinations = formatAddrKeySet(dstSeen)
+
+	for p := startPort; p <= endPort && p < len(counts); p++ {
+		if counts[p] > 0 {
+			res.TopPorts = append(res.TopPorts, portCount{Port: p, Count: counts[p]})
+		}
+	}
+	sort.Slice(res.TopPorts, func(i, j int) bool {
+		return res.TopPorts[i].Count > res.TopPorts[j].Count
+	})
+	if len(res.TopPorts) > 10 {
+		res.TopPorts = res.TopPorts[:10]
+	}
+
+	return res, nil
+}
+
+// pcapAnalysis bundles one parse of a capture with its per-call index, so
+// every tool derives its view from the same pass instead of re-fetching
+// and re-parsing per question.
+type pcapAnalysis struct {
+	Messages []sipMessage
+	groups   []*callGroup
+}
+
+// CallGroups returns the per-call index, building it on first use.
+func (a *pcapAnalysis) CallGroups() []*callGroup {
+	if a.groups == nil {
+		a.groups = groupByCallID(a.Messages)
+	}
+	return a.groups
+}
+
+// analyzePCAP fetches a pcap from a container and parses it with the
+// native parser. It is the shared entry point for all pcap tools when
+// tshark is unavailable in the container.
+func analyzePCAP(ctx context.Context, mgr *ssh.Manager, container, pcapFile, target string, opts sipParseOpts) (*pcapAnalysis, error) {
+	data, err := fetchPCAPFromContainer(ctx, mgr, container, pcapFile, target, DefaultPCAPLimit)
+	if err != nil {
+		return nil, err
+	}
+	msgs, err := parsePCAPBytes(ctx, data, opts)
+	if err != nil {
+		return nil, err
+	}
+	return &pcapAnalysis{Messages: msgs}, nil
+}
+
+// formatRegistrations renders REGISTER dialogs and their outcomes.
+func formatRegistrations(groups []*callGroup) string {
+	var sb strings.Builder
+	for _, g := range groups {
+		isRegister := false
+		for _, m := range g.Messages {
+			if m.Method == "REGISTER" {
+				isRegister = true
+				break
+			}
+		}
+		if !isRegister {
+			continue
+		}
+
+		outcome := "no response"
+		switch {
+		case g.LastCode == 200:
+			outcome = "registered"
+		case g.LastCode == 401 || g.LastCode == 407:
+			outcome = "auth challenged"
+		case g.LastCode == 403:
+			outcome = "forbidden"
+		case g.LastCode != 0:
+			outcome = fmt.Sprintf("failed (%d)", g.LastCode)
+		}
+
+		first := g.Messages[0]
+		sb.WriteString(fmt.Sprintf("%s  user=%s  src=%s  outcome=%s  Call-ID: %s\n",
+			formatSIPTimestamp(first.Timestamp), g.Caller, first.Src, outcome, g.CallID))
+	}
+	return strings.TrimRight(sb.String(), "\n")
+}
+
+// formatCallStats renders aggregate statistics for a capture, mirroring
+// the sections the tshark path produces.
+func formatCallStats(a *pcapAnalysis) string {
+	methodCounts := make(map[string]int)
+	statusCounts := make(map[int]int)
+	for i := range a.Messages {
+		m := &a.Messages[i]
+		if m.Method != "" {
+			methodCounts[m.Method]++
+		} else {
+			statusCounts[m.Status]++
+		}
+	}
+
+	var sb strings.Builder
+	sb.WriteString("=== SIP STATISTICS ===\n\n--- Request Methods ---\n")
+	writeCountTable(&sb, methodCounts)
+	sb.WriteString("\n--- Response Codes ---\n")
+	codes := make(map[string]int, len(statusCounts))
+	for code, n := range statusCounts {
+		codes[strconv.Itoa(code)] = n
+	}
+	writeCountTable(&sb, codes)
+	sb.WriteString(fmt.Sprintf("\nTotal calls: %d\n", len(a.CallGroups())))
+	return strings.TrimRight(sb.String(), "\n")
+}
+
+// writeCountTable renders "count key" lines sorted by descending count.
+func writeCountTable(sb *strings.Builder, counts map[string]int) {
+	type entry struct {
+		key   string
+		count int
+	}
+	entries := make([]entry, 0, len(counts))
+	for k, n := range counts {
+		entries = append(entries, entry{k, n})
+	}
+	sort.Slice(entries, func(i, j int) bool {
+		if entries[i].count != entries[j].count {
+			return entries[i].count > entries[j].count
+		}
+		return entries[i].key < entries[j].key
+	})
+	for _, e := range entries {
+		sb.WriteString(fmt.Sprintf("%7d %s\n", e.count, e.key))
+	}
+}
+
+// formatSDP extracts connection, media and rtpmap lines from the SDP
+// bodies of messages, optionally filtered by Call-ID.
+func formatSDP(msgs []sipMessage, callID string) string {
+	var sb strings.Builder
+	for i := range msgs {
+		m := &msgs[i]
+		if callID != "" && m.CallID != callID {
+			continue
+		}
+		if !strings.Contains(m.Body, "m=") {
+			continue
+		}
+		sb.WriteString(summarizeSIPMessage(m))
+		sb.WriteString("\n")
+		for _, line := range strings.Split(m.Body, "\n") {
+			line = strings.TrimRight(line, "\r")
+			if strings.HasPrefix(line, "c=") || strings.HasPrefix(line, "m=") || strings.HasPrefix(line, "a=rtpmap") {
+				sb.WriteString("    " + line + "\n")
+			}
+		}
+	}
+	return strings.TrimRight(sb.String(), "\n")
+}
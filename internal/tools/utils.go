@@ -1,7 +1,13 @@
 package tools
 
 import (
+	"context"
+	"fmt"
 	"strings"
+	"sync"
+	"time"
+
+	"ssh-mcp/internal/ssh"
 )
 
 // shellQuote quotes a string for safe shell use.
@@ -24,10 +30,12 @@ func trimOutput(s string) string {
 	return strings.TrimSpace(s)
 }
 
-// sedEscapeLiteral escapes a literal string for use in a sed s/pattern/ context.
-// Escapes: / \ & . * [ ] ^ $ and newlines.
-func sedEscapeLiteral(s string) string {
-	replacer := strings.NewReplacer(
+// The sed escape replacers are built once at package scope. A
+// strings.Replacer compiles its lookup structure on first use, and
+// rebuilding one per call threw that work away every time the file
+// tools touched another line.
+var (
+	sedLiteralReplacer = strings.NewReplacer(
 		`\`, `\\`,
 		`/`, `\/`,
 		`&`, `\&`,
@@ -39,29 +47,34 @@ func sedEscapeLiteral(s string) string {
 		`$`, `\$`,
 		"\n", `\n`,
 	)
-	return replacer.Replace(s)
+	sedPatternReplacer = strings.NewReplacer(
+		`/`, `\/`,
+		"\n", `\n`,
+	)
+	sedReplacementReplacer = strings.NewReplacer(
+		`\`, `\\`,
+		`/`, `\/`,
+		`&`, `\&`,
+		"\n", `\n`,
+	)
+)
+
+// sedEscapeLiteral escapes a literal string for use in a sed s/pattern/ context.
+// Escapes: / \ & . * [ ] ^ $ and newlines.
+func sedEscapeLiteral(s string) string {
+	return sedLiteralReplacer.Replace(s)
 }
 
 // sedEscapePattern escapes a regex pattern for use in sed, only escaping the delimiter.
 // The pattern is passed as-is for regex matching, only / and newlines are escaped.
 func sedEscapePattern(s string) string {
-	replacer := strings.NewReplacer(
-		`/`, `\/`,
-		"\n", `\n`,
-	)
-	return replacer.Replace(s)
+	return sedPatternReplacer.Replace(s)
 }
 
 // sedEscapeReplacement escapes a replacement string for sed s//replacement/ context.
 // Only escapes: / \ & and newlines (these have special meaning in sed replacements).
 func sedEscapeReplacement(s string) string {
-	replacer := strings.NewReplacer(
-		`\`, `\\`,
-		`/`, `\/`,
-		`&`, `\&`,
-		"\n", `\n`,
-	)
-	return replacer.Replace(s)
+	return sedReplacementReplacer.Replace(s)
 }
 
 // sedEscapeInsertText escapes text for sed i\ or a\ commands.
@@ -69,3 +82,58 @@ func sedEscapeReplacement(s string) string {
 func sedEscapeInsertText(s string) string {
 	return strings.ReplaceAll(s, "\n", `\n`)
 }
+
+// Tool availability rarely changes while a session is open, yet probes
+// like checkDockerAvailable run ahead of nearly every handler — each one
+// a full SSH round-trip. Results are cached per (manager, target, tool)
+// for a short TTL so steady-state checks cost a map lookup instead.
+const toolProbeTTL = 60 * time.Second
+
+type toolProbeKey struct {
+	mgr    *ssh.Manager
+	target string
+	tool   string
+}
+
+type toolProbeEntry struct {
+	available bool
+	checked   time.Time
+}
+
+var (
+	toolProbeMu    sync.Mutex
+	toolProbeCache = make(map[toolProbeKey]toolProbeEntry)
+)
+
+// toolAvailable reports whether tool exists on the target, probing over
+// SSH on cache miss and remembering the answer for toolProbeTTL.
+func toolAvailable(ctx context.Context, mgr *ssh.Manager, target, tool string) (bool, error) {
+	key := toolProbeKey{mgr: mgr, target: target, tool: tool}
+	toolProbeMu.Lock()
+	entry, ok := toolProbeCache[key]
+	toolProbeMu.Unlock()
+	if ok && time.Since(entry.checked) < toolProbeTTL {
+		return entry.available, nil
+	}
+
+	cmd := fmt.Sprintf("command -v %s >/dev/null 2>&1 && echo 'ok' || echo 'missing'", shellQuote(tool))
+	output, err := mgr.Execute(ctx, cmd, target)
+	if err != nil {
+		return false, err
+	}
+	available := containsString(output, "ok")
+
+	// Sweep expired entries while holding the lock anyway: the cache is
+	// keyed by manager pointer, so without eviction entries for closed
+	// sessions — and the managers themselves — would be retained for the
+	// life of the process.
+	toolProbeMu.Lock()
+	for k, e := range toolProbeCache {
+		if time.Since(e.checked) >= toolProbeTTL {
+			delete(toolProbeCache, k)
+		}
+	}
+	toolProbeCache[key] = toolProbeEntry{available: available, checked: time.Now()}
+	toolProbeMu.Unlock()
+	return available, nil
+}
@@ -1,9 +1,13 @@
 package tools
 
 import (
+	"bufio"
 	"context"
 	"encoding/json"
+	"errors"
 	"fmt"
+	"regexp"
+	"strconv"
 	"strings"
 	"time"
 
@@ -147,6 +151,11 @@ func registerVoIPTools(s *server.MCPServer, pool *ssh.Pool) {
 	)
 }
 
+// defaultVoIPKeywords are the container name/image keywords discovery
+// matches by default. Kept lowercase so the matching loop never lowers
+// a keyword per container.
+var defaultVoIPKeywords = []string{"gw", "media", "fs", "sbc", "sw", "freeswitch", "asterisk", "kamailio", "opensips", "rtpengine"}
+
 func createVoIPDiscoverHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 	return func(ctx context.Context, req mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 		mgr := getManager(ctx, pool)
@@ -160,39 +169,33 @@ func createVoIPDiscoverHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
 
-		// Default VoIP keywords
-		defaultKeywords := []string{"gw", "media", "fs", "sbc", "sw", "freeswitch", "asterisk", "kamailio", "opensips", "rtpengine"}
-
-		// Use custom keywords if provided via arguments
-		keywords := defaultKeywords
+		// Use custom keywords if provided via arguments, lowercased once
+		// here rather than per container in the matching loop
+		keywords := defaultVoIPKeywords
 		if rawKW, ok := req.GetArguments()["keywords"]; ok {
 			if kwArr, ok := rawKW.([]interface{}); ok && len(kwArr) > 0 {
 				keywords = make([]string, 0, len(kwArr))
 				for _, kw := range kwArr {
 					if s, ok := kw.(string); ok && s != "" {
-						keywords = append(keywords, s)
+						keywords = append(keywords, strings.ToLower(s))
 					}
 				}
 				if len(keywords) == 0 {
-					keywords = defaultKeywords
+					keywords = defaultVoIPKeywords
 				}
 			}
 		}
 
-		// Build grep pattern
-		pattern := strings.Join(keywords, "\\|")
-		cmd := fmt.Sprintf(`docker ps --format '{{.Names}}|{{.Image}}' | grep -iE '%s' 2>/dev/null || echo ''`, pattern)
-
+		// Fetch the plain list and match keywords here: the old remote
+		// grep -iE pipe interpolated user keywords into a regex (so "fs."
+		// matched more than intended) and cost a second process on the
+		// host for a list that is rarely more than a screenful.
+		cmd := `docker ps --format '{{.Names}}|{{.Image}}'`
 		output, err := mgr.Execute(ctx, cmd, target)
 		if err != nil {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
 
-		if trimOutput(output) == "" {
-			return mcp.NewToolResultText("No VoIP containers found"), nil
-		}
-
-		// Parse output into structured format
 		var containers []map[string]string
 		for _, line := range strings.Split(output, "\n") {
 			line = strings.TrimSpace(line)
@@ -200,14 +203,26 @@ func createVoIPDiscoverHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 				continue
 			}
 			parts := strings.SplitN(line, "|", 2)
-			if len(parts) == 2 {
-				containers = append(containers, map[string]string{
-					"name":  parts[0],
-					"image": parts[1],
-				})
+			if len(parts) != 2 {
+				continue
+			}
+			nameLower := strings.ToLower(parts[0])
+			imageLower := strings.ToLower(parts[1])
+			for _, kw := range keywords {
+				if strings.Contains(nameLower, kw) || strings.Contains(imageLower, kw) {
+					containers = append(containers, map[string]string{
+						"name":  parts[0],
+						"image": parts[1],
+					})
+					break
+				}
 			}
 		}
 
+		if len(containers) == 0 {
+			return mcp.NewToolResultText("No VoIP containers found"), nil
+		}
+
 		jsonBytes, _ := json.MarshalIndent(containers, "", "  ")
 		return mcp.NewToolResultText(string(jsonBytes)), nil
 	}
@@ -226,17 +241,14 @@ func createSIPCaptureHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 		protocol := req.GetString("protocol", "")
 		target := req.GetString("target", "primary")
 
-		if err := checkDockerAvailable(ctx, mgr, target); err != nil {
+		// Check docker and sngrep in one round-trip
+		if err := checkContainerTool(ctx, mgr, container, "sngrep", target); err != nil {
+			if containsString(err.Error(), "sngrep") {
+				return mcp.NewToolResultError("sngrep not available in container. Install with: apt-get install sngrep"), nil
+			}
 			return mcp.NewToolResultError(err.Error()), nil
 		}
 
-		// Check if sngrep is available
-		checkCmd := fmt.Sprintf("docker exec %s command -v sngrep >/dev/null 2>&1 && echo 'ok' || echo 'missing'", shellQuote(container))
-		checkOutput, err := mgr.Execute(ctx, checkCmd, target)
-		if err != nil || !containsString(checkOutput, "ok") {
-			return mcp.NewToolResultError("sngrep not available in container. Install with: apt-get install sngrep"), nil
-		}
-
 		// Build BPF filter
 		bpfFilter := buildSIPFilter(port, protocol)
 
@@ -300,12 +312,12 @@ func createCallFlowHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 		var cmd string
 		if summaryOnly {
 			// Get summary: method, response codes, call-ids
-			cmd = fmt.Sprintf(`docker exec %s sh -c 'if command -v tshark >/dev/null 2>&1; then tshark -r %s -T fields -e frame.time -e ip.src -e ip.dst -e sip.Method -e sip.Status-Code -e sip.Call-ID %s 2>/dev/null | head -100; else sngrep -I %s -q 2>/dev/null | head -50 || echo "No analysis tool available"; fi'`,
-				shellQuote(container), pcapFile, filter, pcapFile)
+			cmd = fmt.Sprintf(`docker exec %s sh -c 'if command -v tshark >/dev/null 2>&1; then tshark -r %s -T fields -e frame.time -e ip.src -e ip.dst -e sip.Method -e sip.Status-Code -e sip.Call-ID %s 2>/dev/null | head -100; else echo "__NO_TSHARK__"; fi'`,
+				shellQuote(container), pcapFile, filter)
 		} else {
 			// Get detailed call flow
-			cmd = fmt.Sprintf(`docker exec %s sh -c 'if command -v tshark >/dev/null 2>&1; then tshark -r %s -V -Y sip %s 2>/dev/null | head -500; else cat %s 2>/dev/null | strings | grep -E "^(INVITE|REGISTER|BYE|ACK|CANCEL|SIP/2.0)" | head -100 || echo "No analysis tool available"; fi'`,
-				shellQuote(container), pcapFile, filter, pcapFile)
+			cmd = fmt.Sprintf(`docker exec %s sh -c 'if command -v tshark >/dev/null 2>&1; then tshark -r %s -V -Y sip %s 2>/dev/null | head -500; else echo "__NO_TSHARK__"; fi'`,
+				shellQuote(container), pcapFile, filter)
 		}
 
 		output, err := mgr.Execute(ctx, cmd, target)
@@ -313,6 +325,28 @@ func createCallFlowHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
 
+		// No tshark in the container: fetch the pcap and analyze it here
+		// with the native parser instead of requiring tools remotely.
+		if containsString(output, "__NO_TSHARK__") {
+			// A call-id filter is applied during the parse itself, so
+			// non-matching calls never allocate messages at all.
+			analysis, aErr := analyzePCAP(ctx, mgr, container, pcapFile, target, sipParseOpts{callID: callID})
+			if aErr != nil {
+				return mcp.NewToolResultError(aErr.Error()), nil
+			}
+			if phoneNumber == "" {
+				if len(analysis.Messages) == 0 {
+					return mcp.NewToolResultText("No SIP messages found in capture"), nil
+				}
+				return mcp.NewToolResultText(formatCallFlows(analysis.CallGroups(), summaryOnly)), nil
+			}
+			msgs := filterSIPMessages(analysis.Messages, "", phoneNumber)
+			if len(msgs) == 0 {
+				return mcp.NewToolResultText("No SIP messages found in capture"), nil
+			}
+			return mcp.NewToolResultText(formatCallFlows(groupByCallID(msgs), summaryOnly)), nil
+		}
+
 		return mcp.NewToolResultText(output), nil
 	}
 }
@@ -332,15 +366,27 @@ func createRegistrationsHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
 
-		// Extract REGISTER dialogs using tshark or strings
-		cmd := fmt.Sprintf(`docker exec %s sh -c 'if command -v tshark >/dev/null 2>&1; then tshark -r %s -Y "sip.Method == REGISTER or (sip.CSeq.method == REGISTER and sip.Status-Code)" -T fields -e frame.time -e sip.from.user -e sip.to.user -e sip.contact.uri -e sip.Status-Code -E header=y 2>/dev/null; else cat %s 2>/dev/null | strings | grep -E "(REGISTER|200 OK|401|403)" | head -50; fi'`,
-			shellQuote(container), pcapFile, pcapFile)
+		// Extract REGISTER dialogs using tshark
+		cmd := fmt.Sprintf(`docker exec %s sh -c 'if command -v tshark >/dev/null 2>&1; then tshark -r %s -Y "sip.Method == REGISTER or (sip.CSeq.method == REGISTER and sip.Status-Code)" -T fields -e frame.time -e sip.from.user -e sip.to.user -e sip.contact.uri -e sip.Status-Code -E header=y 2>/dev/null; else echo "__NO_TSHARK__"; fi'`,
+			shellQuote(container), pcapFile)
 
 		output, err := mgr.Execute(ctx, cmd, target)
 		if err != nil {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
 
+		if containsString(output, "__NO_TSHARK__") {
+			analysis, aErr := analyzePCAP(ctx, mgr, container, pcapFile, target, sipParseOpts{})
+			if aErr != nil {
+				return mcp.NewToolResultError(aErr.Error()), nil
+			}
+			text := formatRegistrations(analysis.CallGroups())
+			if text == "" {
+				return mcp.NewToolResultText("No REGISTER dialogs found in capture"), nil
+			}
+			return mcp.NewToolResultText(text), nil
+		}
+
 		return mcp.NewToolResultText(output), nil
 	}
 }
@@ -374,14 +420,22 @@ if command -v tshark >/dev/null 2>&1; then
   echo "--- Unique Call-IDs ---"
   tshark -r %s -Y sip -T fields -e sip.Call-ID 2>/dev/null | sort -u | wc -l | xargs echo "Total calls:"
 else
-  cat %s 2>/dev/null | strings | grep -oE "^(INVITE|REGISTER|BYE|ACK|CANCEL|OPTIONS|SIP/2.0 [0-9]+)" | sort | uniq -c | sort -rn
-fi'`, shellQuote(container), pcapFile, pcapFile, pcapFile, pcapFile)
+  echo "__NO_TSHARK__"
+fi'`, shellQuote(container), pcapFile, pcapFile, pcapFile)
 
 		output, err := mgr.Execute(ctx, cmd, target)
 		if err != nil {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
 
+		if containsString(output, "__NO_TSHARK__") {
+			analysis, aErr := analyzePCAP(ctx, mgr, container, pcapFile, target, sipParseOpts{})
+			if aErr != nil {
+				return mcp.NewToolResultError(aErr.Error()), nil
+			}
+			return mcp.NewToolResultText(formatCallStats(analysis)), nil
+		}
+
 		return mcp.NewToolResultText(output), nil
 	}
 }
@@ -410,14 +464,26 @@ func createExtractSDPHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 		}
 
 		// Extract SDP with tshark
-		cmd := fmt.Sprintf(`docker exec %s sh -c 'if command -v tshark >/dev/null 2>&1; then tshark -r %s %s -T fields -e sdp.connection_info -e sdp.media -e sdp.media.port -e sdp.media.format -E header=y 2>/dev/null | head -50; else cat %s 2>/dev/null | strings | grep -E "^(c=|m=|a=rtpmap)" | head -50; fi'`,
-			shellQuote(container), pcapFile, filter, pcapFile)
+		cmd := fmt.Sprintf(`docker exec %s sh -c 'if command -v tshark >/dev/null 2>&1; then tshark -r %s %s -T fields -e sdp.connection_info -e sdp.media -e sdp.media.port -e sdp.media.format -E header=y 2>/dev/null | head -50; else echo "__NO_TSHARK__"; fi'`,
+			shellQuote(container), pcapFile, filter)
 
 		output, err := mgr.Execute(ctx, cmd, target)
 		if err != nil {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
 
+		if containsString(output, "__NO_TSHARK__") {
+			analysis, aErr := analyzePCAP(ctx, mgr, container, pcapFile, target, sipParseOpts{wantBody: true, callID: callID})
+			if aErr != nil {
+				return mcp.NewToolResultError(aErr.Error()), nil
+			}
+			text := formatSDP(analysis.Messages, "")
+			if text == "" {
+				return mcp.NewToolResultText("No SDP bodies found in capture"), nil
+			}
+			return mcp.NewToolResultText(text), nil
+		}
+
 		return mcp.NewToolResultText(output), nil
 	}
 }
@@ -439,25 +505,68 @@ func createPacketCheckHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 		}
 
 		// Quick packet check using tcpdump
-		cmd := fmt.Sprintf(`docker exec %s sh -c 'if command -v tcpdump >/dev/null 2>&1; then timeout %ds tcpdump -i %s -c 20 port 5060 or port 5061 2>&1 | tail -25; else echo "tcpdump not available"; fi'`,
-			shellQuote(container), duration, iface)
-
-		output, err := mgr.Execute(ctx, cmd, target)
+		// -s 96 covers link + IP + transport headers plus the SIP start
+		// line; this tool only checks presence, so full frames would just
+		// cost kernel-to-userspace copy bandwidth. -l line-buffers tcpdump
+		// so lines stream back as packets arrive instead of at exit.
+		// -nn keeps addresses and ports numeric: no reverse-DNS stalls,
+		// and the packet regex below relies on numeric port tokens
+		// (without it tcpdump renders 5060 as "sip" via /etc/services).
+		cmd := fmt.Sprintf(`docker exec %s sh -c 'if command -v tcpdump >/dev/null 2>&1; then timeout %ds tcpdump -l -nn -i %s -s 96 -c 20 %s 2>&1; else echo "tcpdump not available"; fi'`,
+			shellQuote(container), duration, iface, sipPortsFilter)
+
+		// Scan the stream line by line: memory stays constant however
+		// long the capture runs, and matching overlaps the wait.
+		stream, err := mgr.ExecuteStream(ctx, cmd, target)
 		if err != nil {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
+		defer stream.Close()
+
+		packetLines := 0
+		var shown []string
+		scanner := bufio.NewScanner(stream)
+		for scanner.Scan() {
+			line := scanner.Text()
+			if tcpdumpPacketRE.MatchString(line) {
+				packetLines++
+			}
+			if len(shown) < 25 {
+				shown = append(shown, line)
+			}
+		}
+		// A dead stream ends the scan the same way a finished capture
+		// does; surface it rather than reporting "no packets" off a
+		// partial read.
+		if err := scanner.Err(); err != nil {
+			return mcp.NewToolResultError(err.Error()), nil
+		}
 
-		// Summarize
-		hasPackets := containsString(output, "UDP") || containsString(output, "TCP") || containsString(output, "SIP")
 		summary := "SIP packets detected: NO"
-		if hasPackets {
-			summary = "SIP packets detected: YES"
+		if packetLines > 0 {
+			summary = fmt.Sprintf("SIP packets detected: YES (%d packets)", packetLines)
 		}
 
-		return mcp.NewToolResultText(fmt.Sprintf("%s\n\n%s", summary, output)), nil
+		return mcp.NewToolResultText(fmt.Sprintf("%s\n\n%s", summary, strings.Join(shown, "\n"))), nil
 	}
 }
 
+// hostNetnsCaptureCmd builds a capture command that runs tcpdump on the
+// host inside the container's network namespace, for container images
+// that ship no tcpdump. One docker inspect resolves the container's PID
+// and nsenter -n joins its netns, so the capture is a single host-side
+// process with nothing execed in the container. Emits __NO_PID__ when
+// the container is not running and __NO_HOST_TCPDUMP__ when the host
+// lacks nsenter or tcpdump; non-root sessions try passwordless sudo.
+func hostNetnsCaptureCmd(container string, duration int, iface, snapArgs, pcapPath, filter string) string {
+	return fmt.Sprintf(`PID=$(docker inspect -f '{{.State.Pid}}' %s 2>/dev/null); `+
+		`if [ -z "$PID" ] || [ "$PID" = "0" ]; then echo __NO_PID__; `+
+		`elif ! command -v nsenter >/dev/null 2>&1 || ! command -v tcpdump >/dev/null 2>&1; then echo __NO_HOST_TCPDUMP__; `+
+		`else SUDO=""; [ "$(id -u)" -eq 0 ] || SUDO="sudo -n"; `+
+		`timeout %ds $SUDO nsenter -t "$PID" -n tcpdump -i %s %s -w %s %s >/dev/null 2>&1 || true; fi`,
+		shellQuote(container), duration, iface, snapArgs, pcapPath, filter)
+}
+
 func createNetworkCaptureHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 	return func(ctx context.Context, req mcp.CallToolRequest) (*mcp.CallToolResult, error) {
 		mgr := getManager(ctx, pool)
@@ -477,13 +586,33 @@ func createNetworkCaptureHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 		pcapPath := fmt.Sprintf("/tmp/voip_net_%d.pcap", time.Now().Unix())
 
 		// Capture with tcpdump
-		cmd := fmt.Sprintf(`docker exec %s sh -c 'if command -v tcpdump >/dev/null 2>&1; then timeout %ds tcpdump -i %s -w %s port 5060 or port 5061 2>&1 || true; else echo "tcpdump not available"; fi'`,
-			shellQuote(container), duration, iface, pcapPath)
-
-		mgr.Execute(ctx, cmd, target) // Ignore timeout (expected with captures)
+		cmd := fmt.Sprintf(`docker exec %s sh -c 'if command -v tcpdump >/dev/null 2>&1; then timeout %ds tcpdump -i %s -w %s %s 2>&1 || true; else echo "tcpdump not available"; fi'`,
+			shellQuote(container), duration, iface, pcapPath, sipPortsFilter)
+
+		output, _ := mgr.Execute(ctx, cmd, target) // Timeout exit is expected with captures
+
+		location := "container"
+		message := "Network capture complete. Analyze with voip_call_flow or copy with docker_cp_from"
+		if containsString(output, "tcpdump not available") {
+			// No tcpdump in the image: capture from the host inside the
+			// container's network namespace instead.
+			fallback := hostNetnsCaptureCmd(container, duration, iface, "", pcapPath, sipPortsFilter)
+			output, _ = mgr.Execute(ctx, fallback, target)
+			if containsString(output, "__NO_PID__") {
+				return mcp.NewToolResultError(fmt.Sprintf("container %s is not running", container)), nil
+			}
+			if containsString(output, "__NO_HOST_TCPDUMP__") {
+				return mcp.NewToolResultError("tcpdump not available in container or on host. Install with: apt-get install tcpdump"), nil
+			}
+			location = "host"
+			message = "Network capture complete (container has no tcpdump; captured on the host via nsenter). The pcap is on the remote host, not in the container."
+		}
 
 		// Verify PCAP file was created
 		checkFile := fmt.Sprintf("docker exec %s test -f %s && echo 'exists' || echo 'missing'", shellQuote(container), pcapPath)
+		if location == "host" {
+			checkFile = fmt.Sprintf("test -f %s && echo 'exists' || echo 'missing'", pcapPath)
+		}
 		checkResult, _ := mgr.Execute(ctx, checkFile, target)
 		fileStatus := "created"
 		if !containsString(checkResult, "exists") {
@@ -493,10 +622,11 @@ func createNetworkCaptureHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 		result := map[string]interface{}{
 			"container":   container,
 			"pcap_file":   pcapPath,
+			"location":    location,
 			"duration":    duration,
 			"interface":   iface,
 			"file_status": fileStatus,
-			"message":     fmt.Sprintf("Network capture complete. Analyze with voip_call_flow or copy with docker_cp_from"),
+			"message":     message,
 		}
 
 		jsonBytes, _ := json.MarshalIndent(result, "", "  ")
@@ -521,31 +651,107 @@ func createRTPCaptureHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
 
-		// Parse port range
-		ports := strings.Split(portRange, "-")
-		startPort := "50000"
-		endPort := "60000"
-		if len(ports) == 2 {
-			startPort = ports[0]
-			endPort = ports[1]
-		}
+		startPort, endPort := parsePortRange(portRange, 50000, 60000)
 
-		// Capture RTP packets and count
-		cmd := fmt.Sprintf(`docker exec %s sh -c 'if command -v tcpdump >/dev/null 2>&1; then timeout %ds tcpdump -i %s -c 100 "udp portrange %s-%s" 2>&1 | tail -20; else echo "tcpdump not available"; fi'`,
-			shellQuote(container), duration, iface, startPort, endPort)
+		// Capture to a pcap and count packets server-side, so the result is
+		// an exact per-port tally instead of a grep over tcpdump chatter.
+		// Counting only needs link + IP + UDP headers, so truncate frames
+		// at 64 bytes: RTP payloads would otherwise dominate the pcap and
+		// blow the fetch cap on any real media burst.
+		pcapPath := fmt.Sprintf("/tmp/voip_rtp_%d.pcap", time.Now().Unix())
+		cmd := fmt.Sprintf(`docker exec %s sh -c 'if command -v tcpdump >/dev/null 2>&1; then timeout %ds tcpdump -i %s -s 64 -w %s "udp portrange %d-%d" 2>/dev/null || true; else echo "__NO_TCPDUMP__"; fi'`,
+			shellQuote(container), duration, iface, pcapPath, startPort, endPort)
 
 		output, err := mgr.Execute(ctx, cmd, target)
 		if err != nil {
 			return mcp.NewToolResultError(err.Error()), nil
 		}
+		hostCapture := false
+		if containsString(output, "__NO_TCPDUMP__") {
+			// No tcpdump in the image: capture from the host inside the
+			// container's network namespace instead.
+			fallback := hostNetnsCaptureCmd(container, duration, iface, "-s 64", pcapPath,
+				fmt.Sprintf("udp portrange %d-%d", startPort, endPort))
+			output, err = mgr.Execute(ctx, fallback, target)
+			if err != nil {
+				return mcp.NewToolResultError(err.Error()), nil
+			}
+			if containsString(output, "__NO_PID__") {
+				return mcp.NewToolResultError(fmt.Sprintf("container %s is not running", container)), nil
+			}
+			if containsString(output, "__NO_HOST_TCPDUMP__") {
+				return mcp.NewToolResultError("tcpdump not available in container or on host. Install with: apt-get install tcpdump"), nil
+			}
+			hostCapture = true
+		}
+
+		cleanupCmd := fmt.Sprintf("docker exec %s rm -f %s", shellQuote(container), pcapPath)
+		if hostCapture {
+			cleanupCmd = fmt.Sprintf("rm -f %s", pcapPath)
+		}
+
+		var data []byte
+		var fetchErr error
+		if hostCapture {
+			data, fetchErr = fetchPCAPFromHost(ctx, mgr, pcapPath, target, DefaultPCAPLimit)
+		} else {
+			data, fetchErr = fetchPCAPFromContainer(ctx, mgr, container, pcapPath, target, DefaultPCAPLimit)
+		}
+		if errors.Is(fetchErr, errPCAPTooLarge) {
+			// The capture is too big to pull over SSH; count it where it
+			// sits and only ship the aggregate back.
+			countCmd := fmt.Sprintf(`docker exec %s sh -c 'tcpdump -r %s -nn -q 2>/dev/null | wc -l' 2>/dev/null`,
+				shellQuote(container), pcapPath)
+			if hostCapture {
+				countCmd = fmt.Sprintf(`tcpdump -r %s -nn -q 2>/dev/null | wc -l`, pcapPath)
+			}
+			countOutput, countErr := mgr.Execute(ctx, countCmd, target)
+			mgr.Execute(ctx, cleanupCmd, target)
+			if countErr != nil {
+				return mcp.NewToolResultError(countErr.Error()), nil
+			}
+			total, _ := strconv.Atoi(trimOutput(countOutput))
+			summary := "RTP packets detected: NO"
+			if total > 0 {
+				summary = "RTP packets detected: YES"
+			}
+			result := map[string]interface{}{
+				"summary":    summary,
+				"port_range": fmt.Sprintf("%d-%d", startPort, endPort),
+				"duration":   duration,
+				"total":      total,
+				"note":       "capture exceeded the fetch limit; counted in-container without per-port detail",
+			}
+			jsonBytes, _ := json.MarshalIndent(result, "", "  ")
+			return mcp.NewToolResultText(string(jsonBytes)), nil
+		}
+		mgr.Execute(ctx, cleanupCmd, target)
+		if fetchErr != nil {
+			return mcp.NewToolResultError(fetchErr.Error()), nil
+		}
+
+		counts, countErr := countUDPPacketsInRange(data, startPort, endPort)
+		if countErr != nil {
+			return mcp.NewToolResultError(countErr.Error()), nil
+		}
 
-		hasRTP := containsString(output, "UDP") && containsString(output, "packets")
 		summary := "RTP packets detected: NO"
-		if hasRTP {
+		if counts.Total > 0 {
 			summary = "RTP packets detected: YES"
 		}
 
-		return mcp.NewToolResultText(fmt.Sprintf("%s\nPort range: %s\n\n%s", summary, portRange, output)), nil
+		result := map[string]interface{}{
+			"summary":      summary,
+			"port_range":   fmt.Sprintf("%d-%d", startPort, endPort),
+			"duration":     duration,
+			"total":        counts.Total,
+			"top_ports":    counts.TopPorts,
+			"sources":      counts.Sources,
+			"destinations": counts.Destinations,
+		}
+
+		jsonBytes, _ := json.MarshalIndent(result, "", "  ")
+		return mcp.NewToolResultText(string(jsonBytes)), nil
 	}
 }
 
@@ -562,81 +768,103 @@ func createNetworkDiagnosticsHandler(pool *ssh.Pool) server.ToolHandlerFunc {
 		timeout := req.GetInt("timeout", 15)
 		target := req.GetString("target", "primary")
 
-		// Default ports, override from request if provided
+		// Default ports, override from request if provided. An explicit
+		// empty list means "ping only": no port probes are scheduled and
+		// the port section is omitted from the report.
 		ports := []int{5060, 5061}
 		if rawPorts, ok := req.GetArguments()["ports"]; ok {
-			if portArr, ok := rawPorts.([]interface{}); ok && len(portArr) > 0 {
+			if portArr, ok := rawPorts.([]interface{}); ok {
 				ports = make([]int, 0, len(portArr))
 				for _, p := range portArr {
 					if num, ok := p.(float64); ok {
 						ports = append(ports, int(num))
 					}
 				}
-				if len(ports) == 0 {
-					ports = []int{5060, 5061}
-				}
 			}
 		}
 
-		var sb strings.Builder
-		sb.WriteString(fmt.Sprintf("=== NETWORK DIAGNOSTICS: %s ===\n\n", host))
-
-		// Ping
-		sb.WriteString("--- PING ---\n")
-		pingCmd := fmt.Sprintf("ping -c %d -W 3 %s 2>&1 || echo 'Ping failed'", pingCount, shellQuote(host))
-		pingOutput, _ := mgr.Execute(ctx, pingCmd, target)
-		sb.WriteString(pingOutput)
-		sb.WriteString("\n\n")
+		// Ping, traceroute and the port checks are independent, so they
+		// run as background jobs in one remote script and the script
+		// waits for all of them. Wall time becomes the slowest probe
+		// instead of the sum, and the whole thing is one SSH round-trip.
+		// Concurrency lives on the remote side because commands to one
+		// alias serialize on its connection anyway.
+		workDir := fmt.Sprintf("/tmp/voip_diag_%d", time.Now().UnixNano())
 
-		// Traceroute
+		var script strings.Builder
+		script.WriteString(fmt.Sprintf("H=%s; D=%s; mkdir -p \"$D\"\n", shellQuote(host), workDir))
+		script.WriteString(fmt.Sprintf("{ ping -c %d -W 3 \"$H\" 2>&1 || echo 'Ping failed'; } > \"$D/ping\" &\n", pingCount))
 		if doTraceroute {
-			sb.WriteString("--- TRACEROUTE ---\n")
-			traceCmd := fmt.Sprintf("timeout %ds traceroute -m 15 %s 2>&1 || tracepath %s 2>&1 || echo 'Traceroute not available'",
-				timeout, shellQuote(host), shellQuote(host))
-			traceOutput, _ := mgr.Execute(ctx, traceCmd, target)
-			sb.WriteString(traceOutput)
-			sb.WriteString("\n\n")
+			script.WriteString(fmt.Sprintf("{ timeout %ds traceroute -m 15 \"$H\" 2>&1 || tracepath \"$H\" 2>&1 || echo 'Traceroute not available'; } > \"$D/trace\" &\n", timeout))
+		}
+		for i, port := range ports {
+			script.WriteString(fmt.Sprintf("{ timeout 3 bash -c \"echo >/dev/tcp/$H/%d\" >/dev/null 2>&1 && echo 'Port %d: OPEN' || echo 'Port %d: CLOSED/FILTERED'; } > \"$D/port%d\" &\n",
+				port, port, port, i))
 		}
+		script.WriteString("wait\n")
+		script.WriteString("echo '--- PING ---'; cat \"$D/ping\"; echo; echo\n")
+		if doTraceroute {
+			script.WriteString("echo '--- TRACEROUTE ---'; cat \"$D/trace\"; echo; echo\n")
+		}
+		if len(ports) > 0 {
+			script.WriteString("echo '--- TCP PORT CHECKS ---'\n")
+			for i := range ports {
+				script.WriteString(fmt.Sprintf("cat \"$D/port%d\"\n", i))
+			}
+		}
+		script.WriteString("rm -rf \"$D\"\n")
 
-		// TCP Port checks
-		sb.WriteString("--- TCP PORT CHECKS ---\n")
-		for _, port := range ports {
-			checkCmd := fmt.Sprintf("timeout 3 bash -c 'echo >/dev/tcp/%s/%d' 2>&1 && echo 'Port %d: OPEN' || echo 'Port %d: CLOSED/FILTERED'",
-				shellQuote(host), port, port, port)
-			checkOutput, _ := mgr.Execute(ctx, checkCmd, target)
-			sb.WriteString(fmt.Sprintf("%s\n", trimOutput(checkOutput)))
+		output, err := mgr.Execute(ctx, script.String(), target)
+		if err != nil {
+			return mcp.NewToolResultError(err.Error()), nil
 		}
 
+		var sb strings.Builder
+		sb.WriteString(fmt.Sprintf("=== NETWORK DIAGNOSTICS: %s ===\n\n", host))
+		sb.WriteString(output)
 		return mcp.NewToolResultText(sb.String()), nil
 	}
 }
 
+// BPF filters shared by the capture tools. The same strings were
+// previously rebuilt inline in every command; tcpdump's own compile of
+// the program is too cheap to justify the -F filterfile dance, but the
+// duplication meant the filters could silently drift apart.
+const (
+	defaultSIPFilter = "udp port 5060 or tcp port 5060 or tcp port 5061"
+	sipPortsFilter   = "port 5060 or port 5061"
+)
+
+// tcpdumpPacketRE matches a tcpdump flow line ("IP a.b.c.d.5060 > ...:"),
+// compiled once at package scope. The previous detection was three
+// substring scans over the whole output that also matched tcpdump's own
+// startup chatter, reporting packets on empty captures.
+var tcpdumpPacketRE = regexp.MustCompile(`IP6? (\S+?)\.(\d+) > (\S+?)\.(\d+): `)
+
+// sipFilterByProtocol maps a protocol name to its BPF transport keyword
+// and default port, so buildSIPFilter is one map lookup instead of a
+// chain of per-protocol branches duplicating the same format logic.
+var sipFilterByProtocol = map[string]struct {
+	transport   string
+	defaultPort int
+}{
+	"udp": {"udp", SIPUDPPort},
+	"tcp": {"tcp", SIPTCPPort},
+	"tls": {"tcp", SIPTLSPort},
+}
+
 // buildSIPFilter creates BPF filter for SIP traffic.
 func buildSIPFilter(port int, protocol string) string {
-	if protocol != "" {
-		proto := strings.ToLower(protocol)
-		switch proto {
-		case "tls":
-			if port == 0 {
-				port = SIPTLSPort
-			}
-			return fmt.Sprintf("tcp port %d", port)
-		case "tcp":
-			if port == 0 {
-				port = SIPTCPPort
-			}
-			return fmt.Sprintf("tcp port %d", port)
-		case "udp":
-			if port == 0 {
-				port = SIPUDPPort
-			}
-			return fmt.Sprintf("udp port %d", port)
+	if spec, ok := sipFilterByProtocol[strings.ToLower(protocol)]; ok {
+		if port == 0 {
+			port = spec.defaultPort
 		}
+		return fmt.Sprintf("%s port %d", spec.transport, port)
 	}
 
 	if port != 0 {
 		return fmt.Sprintf("udp port %d or tcp port %d", port, port)
 	}
 
-	return "udp port 5060 or tcp port 5060 or tcp port 5061"
+	return defaultSIPFilter
 }